@@ -64,7 +64,7 @@ def create_agent(session_id: str):
     agent_executor = AgentExecutor(
         agent=agent,
         tools=tools,
-        verbose=True,
+        verbose=settings.agent_verbose,
         handle_parsing_errors=True,
     )
     
@@ -102,7 +102,7 @@ async def ask_agent(agent_executor: AgentExecutor, memory, message: str) -> str:
         return response
     
     except Exception as e:
-        logger.error(f"Error in agent execution: {e}", exc_info=True)
+        logger.error("Error in agent execution: %s", e, exc_info=True)
         error_msg = f"I encountered an error while processing your request: {str(e)}"
         # Add error message to memory
         memory.add_ai_message(error_msg)
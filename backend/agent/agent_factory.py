@@ -3,6 +3,7 @@ from langchain.agents import create_openai_tools_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from agent.llm import get_llm
 from agent.tools import get_tools
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -62,7 +63,7 @@ def create_agent_executor(session_id: str) -> AgentExecutor:
     agent_executor = AgentExecutor(
         agent=agent,
         tools=tools,
-        verbose=True,
+        verbose=settings.agent_verbose,
         handle_parsing_errors=True,
     )
     
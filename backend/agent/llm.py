@@ -18,7 +18,7 @@ def get_llm() -> BaseChatModel:
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY must be set when using OpenAI provider")
 
-        logger.info(f"Initializing OpenAI model: {settings.openai_model}")
+        logger.info("Initializing OpenAI model: %s", settings.openai_model)
         return ChatOpenAI(
             model=settings.openai_model,
             api_key=settings.openai_api_key,
@@ -26,7 +26,7 @@ def get_llm() -> BaseChatModel:
         )
 
     elif settings.model_provider == ModelProvider.OLLAMA:
-        logger.info(f"Initializing Ollama model: {settings.ollama_model}")
+        logger.info("Initializing Ollama model: %s", settings.ollama_model)
         return ChatOpenAI(
             model=settings.ollama_model,
             base_url=f"{settings.ollama_base_url}/v1",
@@ -35,7 +35,7 @@ def get_llm() -> BaseChatModel:
         )
 
     elif settings.model_provider == ModelProvider.LMSTUDIO:
-        logger.info(f"Initializing LM Studio model: {settings.lmstudio_model}")
+        logger.info("Initializing LM Studio model: %s", settings.lmstudio_model)
         return ChatOpenAI(
             model=settings.lmstudio_model,
             base_url=settings.lmstudio_base_url,
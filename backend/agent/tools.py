@@ -3,6 +3,7 @@ from langchain_core.tools import tool
 from typing import List, Optional
 from services.vehicle_service import VehicleService
 from services.quote_service import QuoteService
+from services.prefetch_service import PrefetchService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,10 +23,15 @@ def mock_vehicle_lookup(vin: str = None, make: str = None, model: str = None, ye
     Returns:
         Dictionary with vehicle information
     """
-    logger.info(f"Vehicle lookup tool called: vin={vin}, make={make}, model={model}, year={year}")
+    logger.info(
+        "Vehicle lookup tool called: vin=%s, make=%s, model=%s, year=%s",
+        vin, make, model, year
+    )
     
-    # Delegate to service layer
-    return VehicleService.lookup_vehicle(vin=vin, make=make, model=model, year=year)
+    # Delegate to service layer (served from the prefetch cache when predicted)
+    return PrefetchService.call(
+        VehicleService.lookup_vehicle, vin=vin, make=make, model=model, year=year
+    )
 
 
 @tool
@@ -43,12 +49,13 @@ def mock_get_quote(vehicle_make: str, vehicle_model: str, vehicle_year: int, cov
         List of quote dictionaries with provider, premium, and coverage details
     """
     logger.info(
-        f"Get quote tool called: {vehicle_make} {vehicle_model} {vehicle_year}, "
-        f"coverage={coverage_type}"
+        "Get quote tool called: %s %s %s, coverage=%s",
+        vehicle_make, vehicle_model, vehicle_year, coverage_type
     )
     
-    # Delegate to service layer
-    return QuoteService.get_quotes(
+    # Delegate to service layer (served from the prefetch cache when predicted)
+    return PrefetchService.call(
+        QuoteService.get_quotes,
         vehicle_make=vehicle_make,
         vehicle_model=vehicle_model,
         vehicle_year=vehicle_year,
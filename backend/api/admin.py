@@ -0,0 +1,81 @@
+"""Admin API endpoints."""
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from schemas.admin import LoggingSettings, LoggingSettingsUpdate
+from services.runtime_settings_service import RuntimeSettingsService, parse_log_level
+from services.profiling_service import ProfilingService
+from config import settings
+from logging_config import dropped_records
+import asyncio
+import hmac
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Reject the request unless it carries the configured admin token."""
+    if not settings.admin_token:
+        # Admin endpoints are disabled until a token is configured
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """List captured request profiles, newest first."""
+    profiles = await asyncio.to_thread(ProfilingService.list_profiles)
+    return {"profiles": profiles}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    Download a captured profile as collapsed stacks.
+
+    Render with e.g. `flamegraph.pl profile.collapsed > profile.svg`.
+    """
+    content = await asyncio.to_thread(ProfilingService.get_profile, profile_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(content)
+
+
+@router.get("/logging", response_model=LoggingSettings)
+async def get_logging():
+    """Return this worker's log level, agent-trace verbosity and dropped records."""
+    return LoggingSettings(
+        level=logging.getLevelName(logging.getLogger().level),
+        agent_verbose=settings.agent_verbose,
+        dropped_records=dropped_records(),
+    )
+
+
+@router.put("/logging", response_model=LoggingSettings)
+async def update_logging(update: LoggingSettingsUpdate):
+    """
+    Change the log level and agent-trace verbosity without a restart.
+
+    The change is stored in Redis and applied to this worker immediately;
+    other workers pick it up within RUNTIME_SETTINGS_REFRESH_INTERVAL seconds
+    and restarted workers load it at startup. Agent verbosity applies to
+    agent executors created after the change.
+    """
+    if update.level is not None and parse_log_level(update.level) is None:
+        raise HTTPException(status_code=422, detail=f"Unknown log level: {update.level}")
+
+    try:
+        await RuntimeSettingsService.update(level=update.level, agent_verbose=update.agent_verbose)
+    except Exception as e:
+        logger.error("Failed to store runtime logging settings: %s", e)
+        raise HTTPException(status_code=503, detail="Could not store settings for all workers")
+
+    logger.info(
+        "Logging settings updated: level=%s, agent_verbose=%s",
+        settings.log_level, settings.agent_verbose
+    )
+    return await get_logging()
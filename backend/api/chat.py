@@ -1,7 +1,9 @@
 """Chat API endpoint."""
-from fastapi import APIRouter, Cookie, Response
+from fastapi import APIRouter, Cookie, Header, Response
 from schemas.chat import ChatRequest, ChatResponse
 from services.chat_service import ChatService
+from services.profiling_service import ProfilingService
+from logging_config import bind_log_context
 import uuid
 import logging
 
@@ -14,15 +16,18 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 async def chat(
     request: ChatRequest,
     response: Response,
-    sid: str = Cookie(None)
+    sid: str = Cookie(None),
+    x_profile_token: str = Header(None)
 ):
     """
     Handle chat messages. Returns sync JSON response.
     
-    Creates or uses existing session ID via cookie.
+    Creates or uses existing session ID via cookie. Requests carrying a valid
+    X-Profile-Token header (or picked by the sampling rate) are profiled.
     """
     # Generate or use existing session ID
     session_id = sid or str(uuid.uuid4())
+    bind_log_context(session_id=session_id)
     
     # Set session cookie if not present
     if not sid:
@@ -35,16 +40,26 @@ async def chat(
         )
     
     try:
+        meta = {"session_id": session_id}
+        
         # Use service layer to process message
-        reply = await ChatService.process_message(session_id, request.message)
+        if ProfilingService.should_profile(x_profile_token):
+            reply, profile_id = await ProfilingService.profile(
+                ChatService.process_message(session_id, request.message),
+                session_id,
+            )
+            if profile_id:
+                meta["profile_id"] = profile_id
+        else:
+            reply = await ChatService.process_message(session_id, request.message)
         
         return ChatResponse(
             message=reply,
-            meta={"session_id": session_id}
+            meta=meta
         )
     
     except Exception as e:
-        logger.error(f"Error processing chat request: {e}", exc_info=True)
+        logger.error("Error processing chat request: %s", e, exc_info=True)
         return ChatResponse(
             message="I'm sorry, I encountered an error. Please try again.",
             meta={"error": str(e)}
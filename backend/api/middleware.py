@@ -0,0 +1,189 @@
+"""ASGI middleware for the API."""
+from typing import List, Optional, Tuple
+from logging_config import request_id_var
+from services.rate_limiter import BucketPolicy, RateLimiter, rate_limit_headers
+from config import settings
+import json
+import uuid
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Routes that run an LLM-backed agent turn and get the stricter bucket
+LLM_ROUTES = frozenset({("POST", "/chat")})
+# Routes never rate limited (load balancer probes)
+EXEMPT_PATHS = frozenset({"/health"})
+
+
+class RequestContextMiddleware:
+    """
+    Assign each HTTP request an ID for log correlation.
+
+    Reuses an incoming X-Request-ID header when present and echoes the ID back
+    on the response. Implemented as plain ASGI middleware to avoid the extra
+    task and body streaming overhead of BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:128]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+def _session_id(headers) -> Optional[str]:
+    """Extract the `sid` cookie without building a full cookie jar."""
+    for name, value in headers:
+        if name != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            key, _, cookie_value = part.strip().partition("=")
+            if key == "sid" and cookie_value:
+                return cookie_value[:128]
+    return None
+
+
+def _client_ip(scope, trusted_proxies: frozenset) -> Optional[str]:
+    """
+    Return the real client address, or None if only a proxy is visible.
+
+    X-Forwarded-For is honoured only when the peer is a trusted proxy, and the
+    rightmost untrusted entry is used since earlier ones are client-supplied.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else None
+    if peer is None or peer not in trusted_proxies:
+        return peer
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            for address in reversed(value.decode("latin-1").split(",")):
+                address = address.strip()
+                if address and address not in trusted_proxies:
+                    return address
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    Throttle requests per session cookie and per client IP.
+
+    LLM-backed chat turns and cheap routes use separate token buckets, and LLM
+    turns allow far more per IP than per session since many users can share an
+    address. LLM turns are always charged to an IP-class bucket: when a trusted
+    proxy does not say who the client is, all such requests share one strict
+    bucket per proxy, so dropping X-Forwarded-For or rotating session cookies
+    cannot lift the limit. Every response carries
+    RateLimit-Limit/-Remaining/-Reset headers; throttled requests get a 429
+    with Retry-After.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter(settings.redis_url)
+        self.trusted_proxies = frozenset(
+            address.strip()
+            for address in settings.rate_limit_trusted_proxies.split(",")
+            if address.strip()
+        )
+        self.llm_session_policy = BucketPolicy(
+            "llm", settings.rate_limit_llm_rate, settings.rate_limit_llm_burst
+        )
+        self.llm_ip_policy = BucketPolicy(
+            "llm_ip", settings.rate_limit_llm_ip_rate, settings.rate_limit_llm_ip_burst
+        )
+        self.llm_unresolved_policy = BucketPolicy(
+            "llm_unresolved",
+            settings.rate_limit_llm_unresolved_rate,
+            settings.rate_limit_llm_unresolved_burst,
+        )
+        self.default_policy = BucketPolicy(
+            "default", settings.rate_limit_default_rate, settings.rate_limit_default_burst
+        )
+
+    def _buckets(self, scope) -> Tuple[str, List[Tuple[str, BucketPolicy]]]:
+        """
+        Select the route class and the buckets a request is charged against.
+
+        Args:
+            scope: ASGI HTTP scope
+
+        Returns:
+            Tuple of (route class, list of (identity, policy) pairs)
+        """
+        llm = (scope["method"], scope["path"]) in LLM_ROUTES
+        if llm:
+            route, session_policy, ip_policy = "llm", self.llm_session_policy, self.llm_ip_policy
+        else:
+            route, session_policy, ip_policy = "default", self.default_policy, self.default_policy
+
+        buckets: List[Tuple[str, BucketPolicy]] = []
+        session_id = _session_id(scope["headers"])
+        if session_id:
+            buckets.append((f"sid:{session_id}", session_policy))
+        client_ip = _client_ip(scope, self.trusted_proxies)
+        if client_ip:
+            buckets.append((f"ip:{client_ip}", ip_policy))
+        elif llm or not buckets:
+            # No real address: fall back to the proxy itself, strictly for LLM turns
+            client = scope.get("client")
+            peer = client[0] if client else "unknown"
+            buckets.append((f"peer:{peer}", self.llm_unresolved_policy if llm else ip_policy))
+        return route, buckets
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route, buckets = self._buckets(scope)
+        result = await self.limiter.check(route, buckets)
+        headers = rate_limit_headers(result)
+
+        if not result.allowed:
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
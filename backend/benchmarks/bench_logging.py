@@ -0,0 +1,135 @@
+"""Benchmark /chat request throughput with logging off, synchronous and queued.
+
+The LLM is replaced by a coroutine that runs both agent tools (and so every
+tool/service log line) and yields to the event loop, so the numbers isolate
+the cost of the logging pipeline on the request path. Records are written to a
+temporary file; --write-latency-us adds a blocking delay per write to model a
+console, pipe or log shipper that cannot keep up.
+
+Requests go through httpx.ASGITransport, so uvicorn's access log is not part
+of this measurement. Under `uvicorn main:app` the access log also goes through
+the queue, because setup_logging reroutes uvicorn's loggers to it.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_logging [--requests 2000] [--concurrency 50] [--rounds 3]
+        [--write-latency-us 0]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+
+import httpx
+
+import logging_config
+import main
+from agent.tools import mock_get_quote, mock_vehicle_lookup
+from config import settings
+from services.chat_service import ChatService
+
+
+async def fake_process_message(session_id: str, message: str) -> str:
+    """Stand-in for the agent turn: one vehicle lookup and one quote call."""
+    await asyncio.sleep(0)
+    vehicle = mock_vehicle_lookup.invoke({"make": "Toyota", "model": "Camry", "year": 2023})
+    logging.getLogger("agent.agent_factory").debug("Agent scratchpad: %s", vehicle)
+    quotes = mock_get_quote.invoke({
+        "vehicle_make": vehicle["make"],
+        "vehicle_model": vehicle["model"],
+        "vehicle_year": vehicle["year"],
+    })
+    await asyncio.sleep(0)
+    return f"Cheapest quote: {min(q['premium_monthly'] for q in quotes)}"
+
+
+class SlowStream:
+    """File wrapper whose writes block for a fixed time, like a busy console."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data: str) -> int:
+        time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def configure(mode: str, stream) -> None:
+    """Reconfigure the root logger for a benchmark mode."""
+    logging_config.shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    if mode == "off":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "sync":
+        # The previous setup: logging.basicConfig with a blocking handler
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        ))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "queued":
+        logging_config.setup_logging(stream)
+
+
+async def run(requests: int, concurrency: int) -> float:
+    """Send requests to /chat and return the achieved requests per second."""
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with semaphore:
+                response = await client.post(
+                    "/chat",
+                    json={"message": "Quote for a 2023 Toyota Camry"},
+                    cookies={"sid": f"bench-{i % concurrency}"},
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--write-latency-us", type=float, default=0.0)
+    args = parser.parse_args()
+
+    ChatService.process_message = staticmethod(fake_process_message)
+    # All benchmark requests share one client address; don't throttle them
+    settings.rate_limit_enabled = False
+
+    modes = ("off", "sync", "queued")
+    samples = {mode: [] for mode in modes}
+    with tempfile.TemporaryFile("w") as file:
+        stream = SlowStream(file, args.write_latency_us / 1_000_000) if args.write_latency_us else file
+        # Interleave modes across rounds so drift affects all of them equally
+        for _ in range(args.rounds):
+            for mode in modes:
+                configure(mode, stream)
+                # Warm up imports, routes and pools before measuring
+                asyncio.run(run(100, args.concurrency))
+                samples[mode].append(asyncio.run(run(args.requests, args.concurrency)))
+        logging_config.shutdown_logging()
+
+    results = {mode: statistics.median(values) for mode, values in samples.items()}
+
+    for mode, rps in results.items():
+        print(f"{mode:>7}: {rps:8.1f} req/s median ({rps / results['off'] * 100:5.1f}% of off)")
+
+
+if __name__ == "__main__":
+    main_cli()
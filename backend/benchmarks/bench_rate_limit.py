@@ -0,0 +1,130 @@
+"""Microbenchmark the latency RateLimitMiddleware adds to a request.
+
+Calls a trivial ASGI app directly, with and without the middleware, so the
+difference is the limiter's own cost: header parsing, the bucket check and the
+response header injection. The in-process fallback is always measured; the
+Redis path is measured when Redis is reachable at --redis-url (e.g. the
+docker-compose redis service).
+
+Before timing, each backend is checked for enforcement: a burst-N bucket must
+allow exactly N requests and then return 429 with Retry-After. For Redis the
+bucket is drained through two limiter instances, as two workers would.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_rate_limit [--iterations 20000] [--redis-url redis://localhost:6379/0]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from api.middleware import RateLimitMiddleware
+from config import settings
+from services.rate_limiter import BucketPolicy, RateLimiter
+
+SCOPE = {
+    "type": "http",
+    "method": "POST",
+    "path": "/chat",
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"cookie", b"sid=bench-session; theme=dark"),
+    ],
+    # An untrusted peer, so both the session and the IP bucket are checked
+    "client": ("203.0.113.7", 50000),
+}
+
+
+async def app(scope, receive, send):
+    """Minimal ASGI app standing in for the FastAPI router."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure(handler, iterations: int) -> list:
+    """Return per-request latencies in microseconds."""
+    for _ in range(min(1000, iterations)):
+        await handler(SCOPE, receive, send)
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await handler(SCOPE, receive, send)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+async def verify_enforcement(limiters: list, burst: int = 5) -> None:
+    """Check that limiters sharing a backend allow exactly `burst` requests."""
+    policy = BucketPolicy("verify", rate=0.01, burst=burst)
+    identity = f"ip:verify-{time.time_ns()}"
+    results = [
+        await limiters[i % len(limiters)].check("verify", [(identity, policy)])
+        for i in range(burst + 2)
+    ]
+    allowed = [result.allowed for result in results]
+    expected = [True] * burst + [False] * 2
+    if allowed != expected:
+        raise AssertionError(f"Limiter allowed {allowed}, expected {expected}")
+    if results[-1].retry_after <= 0:
+        raise AssertionError("Throttled result has no retry_after")
+    if any(limiter.stats.fallback_checks for limiter in limiters if limiter.use_redis):
+        raise AssertionError("Redis limiter fell back to in-process buckets")
+
+
+def summarize(name: str, latencies: list, baseline: list) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    overhead = statistics.mean(latencies) - statistics.mean(baseline)
+    print(
+        f"{name:>10}: mean {statistics.mean(latencies):7.1f}us  "
+        f"p50 {statistics.median(latencies):7.1f}us  p99 {p99:7.1f}us  "
+        f"overhead {overhead:7.1f}us"
+    )
+
+
+async def run(iterations: int, redis_url: str) -> None:
+    # Keep every request allowed so the full (non-429) path is measured
+    settings.rate_limit_llm_rate = 1e9
+    settings.rate_limit_llm_burst = 1e9
+    settings.rate_limit_llm_ip_rate = 1e9
+    settings.rate_limit_llm_ip_burst = 1e9
+
+    baseline = await measure(app, iterations)
+    summarize("no limit", baseline, baseline)
+
+    local_limiter = RateLimiter(redis_url, use_redis=False)
+    await verify_enforcement([local_limiter])
+    summarize("in-process", await measure(RateLimitMiddleware(app, local_limiter), iterations), baseline)
+
+    redis_limiters = [RateLimiter(redis_url), RateLimiter(redis_url)]
+    try:
+        await redis_limiters[0].check("probe", [("probe", BucketPolicy("probe", 1, 1))], cost=0)
+        if redis_limiters[0].stats.redis_errors:
+            print(f"     redis: skipped (not reachable at {redis_url})")
+            return
+
+        await verify_enforcement(redis_limiters)
+        summarize("redis", await measure(RateLimitMiddleware(app, redis_limiters[0]), iterations), baseline)
+    finally:
+        for limiter in redis_limiters:
+            await limiter.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--redis-url", default=settings.redis_url)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.redis_url))
+
+
+if __name__ == "__main__":
+    main_cli()
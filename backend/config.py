@@ -36,6 +36,42 @@ class Settings(BaseSettings):
     api_base_url: Optional[str] = None
     api_token: Optional[str] = None
 
+    # Logging settings
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_sample_rates: str = ""  # e.g. "agent.tools=0.1,services=0.5"
+    log_queue_size: int = 10000  # records beyond this are dropped
+    agent_verbose: bool = False
+    # How often workers re-read runtime settings changed via /admin/logging
+    runtime_settings_refresh_interval: float = 5.0
+
+    # Speculative tool prefetch settings
+    prefetch_enabled: bool = True
+    prefetch_max_workers: int = 4
+
+    # Request profiling settings
+    admin_token: Optional[str] = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval: float = 0.001
+    profiling_output_dir: str = "profiles"
+    profiling_max_artifacts: int = 50
+
+    # Rate limiting settings (token buckets; rate in tokens/second)
+    rate_limit_enabled: bool = True
+    rate_limit_llm_rate: float = 0.5  # per session
+    rate_limit_llm_burst: float = 10
+    rate_limit_llm_ip_rate: float = 5  # per client IP; NAT/offices share one
+    rate_limit_llm_ip_burst: float = 100
+    # Shared by all LLM requests whose client IP is unknown (behind a proxy)
+    rate_limit_llm_unresolved_rate: float = 0.5
+    rate_limit_llm_unresolved_burst: float = 10
+    rate_limit_default_rate: float = 10
+    rate_limit_default_burst: float = 50
+    # Peers whose X-Forwarded-For is trusted (e.g. the Next.js server)
+    rate_limit_trusted_proxies: str = "127.0.0.1,::1"
+    rate_limit_redis_timeout: float = 0.05
+    rate_limit_redis_backoff: float = 5.0
+
     # CORS settings
     cors_origins: str = "http://localhost:3000"
 
@@ -0,0 +1,233 @@
+"""Non-blocking structured logging setup.
+
+Log calls on the event loop only enqueue the record; a background
+QueueListener thread formats it (lazily, from %-style args) and performs the
+handler I/O. Records carry the current session_id and request_id from context
+variables, and high-volume loggers can be sampled per logger name.
+
+The queue is bounded: when the sink cannot keep up, new records are dropped
+and counted rather than blocking the caller or growing memory. Because
+formatting happens later on the writer thread, callers must not mutate objects
+they pass as log arguments after the log call.
+"""
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+from config import settings
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+
+session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Loggers uvicorn configures with their own blocking StreamHandlers
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DeferredQueueHandler"] = None
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+# (uvicorn's ANSI-colored duplicate of its message is dropped as well)
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "session_id", "request_id", "color_message",
+}
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current session_id and request_id to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = session_id_var.get()
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of sub-WARNING records from selected loggers.
+
+    Rates are matched on the longest logger-name prefix, so `agent` covers
+    `agent.tools` unless `agent.tools` has its own rate.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, Optional[float]] = {}
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            rate = None
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "session_id": getattr(record, "session_id", None),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler merges args into the message before enqueueing, which
+    would run the formatting on the event loop. The queue stays in-process, so
+    the record can be passed through untouched; its args are formatted later,
+    so they must not be mutated after the log call. Records that do not fit in
+    the bounded queue are dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener that waits for room for its stop sentinel in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse a sampling spec such as "agent.tools=0.1,services=0.5".
+
+    Args:
+        spec: Comma-separated logger=rate pairs
+
+    Returns:
+        Mapping of logger name to keep rate between 0 and 1
+    """
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            raise ValueError(f"Invalid log sample rate: {item!r}")
+    return rates
+
+
+def bind_log_context(session_id: Optional[str] = None, request_id: Optional[str] = None) -> None:
+    """
+    Set the session/request identifiers attached to log records.
+
+    Args:
+        session_id: Chat session identifier
+        request_id: Per-request identifier
+    """
+    if session_id is not None:
+        session_id_var.set(session_id)
+    if request_id is not None:
+        request_id_var.set(request_id)
+
+
+def setup_logging(stream: Optional[TextIO] = None) -> None:
+    """
+    Install the queue handler on the root logger and start the writer thread.
+
+    uvicorn's own loggers (including the per-request access log) are stripped
+    of their handlers and made to propagate, so they go through the queue too
+    instead of writing to stdout on the event loop.
+
+    Args:
+        stream: Destination for formatted records (defaults to stderr)
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    level = getattr(logging, settings.log_level.upper(), logging.INFO)
+
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    if settings.log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = DeferredQueueHandler(log_queue)
+    # Filters run on the caller's thread: drop sampled-out records first, then
+    # capture context variables while they are still visible
+    rates = parse_sample_rates(settings.log_sample_rates)
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # uvicorn applies its logging config before importing the app, so this
+    # runs after it under `uvicorn main:app`
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for handler in uvicorn_logger.handlers[:]:
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
+
+    _queue_handler = queue_handler
+    _listener = DrainingQueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def dropped_records() -> int:
+    """Return how many records were dropped because the queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -2,16 +2,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.chat import router as chat_router
+from api.admin import router as admin_router
+from api.middleware import RateLimitMiddleware, RequestContextMiddleware
 from config import settings
+from logging_config import setup_logging
+from services.prefetch_service import PrefetchService
+from services.rate_limiter import RateLimiter
+from services.runtime_settings_service import RuntimeSettingsService
+import asyncio
 import logging
-import os
 
-# Configure logging
-log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure non-blocking structured logging
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Throttle per session and client IP (inside CORS so 429s carry CORS headers)
+rate_limiter = RateLimiter(settings.redis_url)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -30,8 +36,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tag log records with a per-request ID
+app.add_middleware(RequestContextMiddleware)
+
 # Include routers
 app.include_router(chat_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -39,3 +49,31 @@ async def health():
     """Health check endpoint."""
     return {"status": "ok", "provider": settings.model_provider.value}
 
+
+@app.get("/stats/prefetch")
+async def prefetch_stats():
+    """Speculative tool prefetch hit rate and saved time."""
+    return PrefetchService.get_stats()
+
+
+@app.get("/stats/rate-limit")
+async def rate_limit_stats():
+    """Allowed/throttled request counters per bucket class."""
+    return rate_limiter.stats.snapshot()
+
+
+@app.on_event("startup")
+async def startup():
+    """Load runtime settings shared by all workers and keep them in sync."""
+    await RuntimeSettingsService.refresh()
+    app.state.runtime_settings_task = asyncio.create_task(
+        RuntimeSettingsService.refresh_forever()
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks and release shared connections."""
+    app.state.runtime_settings_task.cancel()
+    await rate_limiter.close()
+    await RuntimeSettingsService.close()
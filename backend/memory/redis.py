@@ -25,6 +25,6 @@ def get_memory(session_id: str, redis_url: str) -> RedisChatMessageHistory:
         )
         return memory
     except Exception as e:
-        logger.error(f"Failed to create Redis memory for session {session_id}: {e}")
+        logger.error("Failed to create Redis memory for session %s: %s", session_id, e)
         raise
 
@@ -0,0 +1,16 @@
+"""Admin API request/response schemas."""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class LoggingSettings(BaseModel):
+    """Current runtime logging settings of the worker that answered."""
+    level: str
+    agent_verbose: bool
+    dropped_records: int
+
+
+class LoggingSettingsUpdate(BaseModel):
+    """Runtime logging settings change; omitted fields are left unchanged."""
+    level: Optional[str] = None
+    agent_verbose: Optional[bool] = None
@@ -1,6 +1,7 @@
 """Chat service for orchestrating conversational interactions."""
 from agent.agent_factory import create_agent_executor
 from memory.redis import get_memory
+from services.prefetch_service import PrefetchService
 from config import settings
 import logging
 
@@ -22,6 +23,9 @@ class ChatService:
         Returns:
             Agent response as string
         """
+        # Start likely tool calls while the LLM decides what to do
+        prefetch = PrefetchService.start(message)
+        
         try:
             # Get memory for this session
             memory = get_memory(session_id, settings.redis_url)
@@ -50,7 +54,7 @@ class ChatService:
             return response
         
         except Exception as e:
-            logger.error(f"Error in chat service: {e}", exc_info=True)
+            logger.error("Error in chat service: %s", e, exc_info=True)
             error_msg = f"I encountered an error while processing your request: {str(e)}"
             
             # Try to add error message to memory if memory is available
@@ -59,8 +63,11 @@ class ChatService:
                 memory.add_ai_message(error_msg)
             except Exception:
                 # If memory fails, log but don't fail the request
-                logger.warning(f"Failed to add error message to memory: {e}")
+                logger.warning("Failed to add error message to memory: %s", e)
             
             return error_msg
+        
+        finally:
+            PrefetchService.finish(prefetch)
 
 
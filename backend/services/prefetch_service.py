@@ -0,0 +1,360 @@
+"""Speculative tool prefetch service.
+
+Most quote conversations name the vehicle in the user's message, yet the agent
+spends a full LLM round trip deciding to call the vehicle lookup and quote
+tools. This service extracts likely vehicle slots from the message and starts
+the matching service calls in the background while the LLM is still thinking.
+When the agent then issues a matching tool call, the cached result is returned
+instead of calling the service again.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from services.vehicle_service import VehicleService
+from services.quote_service import QuoteService
+from config import settings
+import copy
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+COVERAGE_TYPES = ("liability", "comprehensive", "full")
+
+# Makes recognised by the slot extractor (lowercase, single token)
+KNOWN_MAKES = frozenset({
+    "acura", "audi", "bmw", "buick", "cadillac", "chevrolet", "chevy",
+    "chrysler", "dodge", "fiat", "ford", "genesis", "gmc", "honda", "hyundai",
+    "infiniti", "jaguar", "jeep", "kia", "lexus", "lincoln", "mazda",
+    "mercedes", "mercedes-benz", "mini", "mitsubishi", "nissan", "peugeot",
+    "porsche", "ram", "renault", "subaru", "suzuki", "tesla", "toyota",
+    "volkswagen", "vw", "volvo",
+})
+
+# Display spellings the agent uses that plain title-casing would get wrong
+_MAKE_SPELLINGS = {"bmw": "BMW", "gmc": "GMC", "vw": "VW"}
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9-]*")
+_YEAR_RE = re.compile(r"\b(19[5-9]\d|20\d{2})\b")
+_VIN_RE = re.compile(r"\b[A-HJ-NPR-Z0-9]{17}\b", re.IGNORECASE)
+_COVERAGE_RE = re.compile(r"\b(liability|comprehensive|full)\b", re.IGNORECASE)
+
+_current_cache: ContextVar[Optional["PrefetchCache"]] = ContextVar(
+    "prefetch_cache", default=None
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the shared prefetch thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.prefetch_max_workers,
+                    thread_name_prefix="prefetch",
+                )
+    return _executor
+
+
+def _display_case(token: str) -> str:
+    """Guess the spelling the agent will pass for a lowercase make or model."""
+    if token.lower() in _MAKE_SPELLINGS:
+        return _MAKE_SPELLINGS[token.lower()]
+    return token.title() if token.islower() else token
+
+
+def make_key(func: Callable, **kwargs) -> Hashable:
+    """
+    Build the cache key for a service call from its exact arguments.
+
+    Arguments are not case-folded: a hit must return exactly what the real
+    call would, and services may echo their arguments back.
+    """
+    args = tuple(sorted(
+        (name, value)
+        for name, value in kwargs.items()
+        if value is not None
+    ))
+    return (func.__qualname__, args)
+
+
+def extract_vehicle_slots(message: str) -> Dict[str, Any]:
+    """
+    Extract likely vehicle slots from a user message.
+
+    Args:
+        message: User message
+
+    Returns:
+        Dictionary with any of vin, make, model, year and coverage_types found
+    """
+    slots: Dict[str, Any] = {}
+
+    vin_match = _VIN_RE.search(message)
+    if vin_match:
+        slots["vin"] = vin_match.group(0)
+
+    year_match = _YEAR_RE.search(message)
+    if year_match:
+        slots["year"] = int(year_match.group(1))
+
+    tokens = _TOKEN_RE.findall(message)
+    for index, token in enumerate(tokens):
+        if token.lower() in KNOWN_MAKES:
+            slots["make"] = _display_case(token)
+            # The model usually follows the make ("Toyota Camry")
+            if index + 1 < len(tokens) and not _YEAR_RE.fullmatch(tokens[index + 1]):
+                slots["model"] = _display_case(tokens[index + 1])
+            break
+
+    coverage_types = []
+    for match in _COVERAGE_RE.finditer(message):
+        coverage = match.group(1).lower()
+        if coverage not in coverage_types:
+            coverage_types.append(coverage)
+    slots["coverage_types"] = coverage_types
+
+    return slots
+
+
+class PrefetchStats:
+    """Process-wide prefetch counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters to zero."""
+        with self._lock:
+            self.requests = 0
+            self.predictions = 0
+            self.hits = 0
+            self.misses = 0
+            self.cancelled = 0
+            self.wasted = 0
+            self.saved_seconds = 0.0
+
+    def record(self, cache: "PrefetchCache") -> None:
+        """Fold the outcome of one request's cache into the totals."""
+        with self._lock:
+            self.requests += 1
+            self.predictions += cache.predictions
+            self.hits += cache.hits
+            self.misses += cache.misses
+            self.cancelled += cache.cancelled
+            self.wasted += cache.wasted
+            self.saved_seconds += cache.saved_seconds
+
+    def snapshot(self) -> dict:
+        """Return the current counters and derived hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "requests": self.requests,
+                "predictions": self.predictions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "wasted": self.wasted,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 6),
+            }
+
+
+class PrefetchCache:
+    """Per-request cache of speculative service calls."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Future, List[float]]] = {}
+        self._used: set = set()
+        self._lock = threading.Lock()
+        self.predictions = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self.wasted = 0
+        self.saved_seconds = 0.0
+
+    def submit(self, func: Callable, **kwargs) -> None:
+        """Start a service call in the background and cache its future."""
+        key = make_key(func, **kwargs)
+        if key in self._entries:
+            return
+
+        # Holds the service call duration once the call has finished
+        elapsed: List[float] = []
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return func(**kwargs)
+            finally:
+                elapsed.append(time.perf_counter() - started)
+
+        # Copy the context so service logs keep the request's session/request IDs
+        self._entries[key] = (_get_executor().submit(copy_context().run, run), elapsed)
+        self.predictions += 1
+
+    def call(self, func: Callable, **kwargs) -> Any:
+        """
+        Return the prefetched result for a call, or run it if not prefetched.
+
+        Args:
+            func: Service function the tool delegates to
+            **kwargs: Arguments of the call
+
+        Returns:
+            Result of the service call
+        """
+        key = make_key(func, **kwargs)
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return func(**kwargs)
+
+        future, elapsed = entry
+        if future.cancel():
+            # Still queued behind other requests' jobs: calling directly is
+            # faster than waiting for a worker
+            with self._lock:
+                self.misses += 1
+                self._used.add(key)
+            return func(**kwargs)
+
+        waited_from = time.perf_counter()
+        try:
+            result = future.result()
+        except Exception as e:
+            # A failed speculative call is retried on the normal path
+            logger.warning("Prefetched call failed, retrying directly: %s", e)
+            with self._lock:
+                self.misses += 1
+                self._used.add(key)
+            return func(**kwargs)
+        waited = time.perf_counter() - waited_from
+
+        with self._lock:
+            self.hits += 1
+            self._used.add(key)
+            if elapsed:
+                # Signed, so waits longer than the call itself show as losses
+                self.saved_seconds += elapsed[0] - waited
+
+        # Callers may mutate the result, so never hand out the cached object
+        return copy.deepcopy(result)
+
+    def close(self) -> None:
+        """Cancel mispredicted calls that have not started yet."""
+        for key, (future, _) in self._entries.items():
+            if key in self._used:
+                continue
+            if future.cancel():
+                self.cancelled += 1
+            else:
+                self.wasted += 1
+
+
+stats = PrefetchStats()
+
+
+class PrefetchService:
+    """Service for speculative vehicle and quote prefetching."""
+
+    @staticmethod
+    def start(message: str) -> Optional[PrefetchCache]:
+        """
+        Start prefetching the service calls a message is likely to trigger.
+
+        The returned cache is made current for the calling context, so tools
+        invoked by the agent further down the same request pick it up through
+        `PrefetchService.call`.
+
+        Args:
+            message: User message
+
+        Returns:
+            PrefetchCache for the request, or None if prefetching is disabled
+        """
+        if not settings.prefetch_enabled:
+            return None
+
+        cache = PrefetchCache()
+        _current_cache.set(cache)
+
+        slots = extract_vehicle_slots(message)
+        vin = slots.get("vin")
+        make = slots.get("make")
+        model = slots.get("model")
+        year = slots.get("year")
+
+        if vin:
+            cache.submit(VehicleService.lookup_vehicle, vin=vin)
+
+        if make and model and year:
+            cache.submit(VehicleService.lookup_vehicle, make=make, model=model, year=year)
+            # Fall back to the tool's default coverage when none is named
+            for coverage_type in slots["coverage_types"] or ["full"]:
+                cache.submit(
+                    QuoteService.get_quotes,
+                    vehicle_make=make,
+                    vehicle_model=model,
+                    vehicle_year=year,
+                    coverage_type=coverage_type,
+                )
+
+        if cache.predictions:
+            logger.debug("Prefetch started %d call(s) for slots=%s", cache.predictions, slots)
+        return cache
+
+    @staticmethod
+    def finish(cache: Optional[PrefetchCache]) -> None:
+        """
+        Cancel unused prefetches and record the request's hit statistics.
+
+        Args:
+            cache: Cache returned by `PrefetchService.start`
+        """
+        if cache is None:
+            return
+
+        cache.close()
+        _current_cache.set(None)
+        stats.record(cache)
+
+        if cache.predictions or cache.misses:
+            logger.info(
+                "Prefetch: predictions=%d, hits=%d, misses=%d, cancelled=%d, "
+                "wasted=%d, saved=%.1fms",
+                cache.predictions, cache.hits, cache.misses, cache.cancelled,
+                cache.wasted, cache.saved_seconds * 1000
+            )
+
+    @staticmethod
+    def call(func: Callable, **kwargs) -> Any:
+        """
+        Run a service call, using the current request's prefetch if available.
+
+        Args:
+            func: Service function to call
+            **kwargs: Arguments of the call
+
+        Returns:
+            Result of the service call
+        """
+        cache = _current_cache.get()
+        if cache is None:
+            return func(**kwargs)
+        return cache.call(func, **kwargs)
+
+    @staticmethod
+    def get_stats() -> dict:
+        """Return process-wide prefetch hit rate and saved time."""
+        return stats.snapshot()
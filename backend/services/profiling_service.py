@@ -0,0 +1,190 @@
+"""On-demand per-request profiling service.
+
+A request is profiled when it carries a valid profiling header or is picked by
+the configured sampling rate. Profiling uses pyinstrument's sampling profiler in
+async mode, so only the awaiting request's coroutine is attributed (time spent
+awaiting other work shows up as an `[await]` frame). The result is written as a
+collapsed-stack file that flamegraph.pl, speedscope or inferno can render.
+"""
+from pathlib import Path
+from typing import Any, Awaitable, List, Optional, Tuple
+from pyinstrument import Profiler
+from config import settings
+import asyncio
+import hmac
+import random
+import re
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_ARTIFACT_SUFFIX = ".collapsed"
+
+
+def _frame_label(frame) -> str:
+    """Render a frame as a collapsed-stack label (no separators allowed)."""
+    if frame.is_synthetic:
+        return frame.function
+    label = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    return label.replace(";", ":")
+
+
+def render_collapsed(root_frame) -> str:
+    """
+    Render a pyinstrument frame tree as collapsed stacks.
+
+    Each line is `frame;frame;frame <microseconds>` using the frame's own time,
+    which is the input format of flamegraph.pl and compatible viewers.
+
+    Args:
+        root_frame: Root frame of a pyinstrument session (may be None)
+
+    Returns:
+        Collapsed-stack text
+    """
+    lines: List[str] = []
+
+    def walk(frame, stack: List[str]) -> None:
+        path = stack + [_frame_label(frame)]
+        own_time = frame.time
+        for child in frame.children:
+            # `[self]` is pyinstrument's marker for the parent's own samples
+            if child.is_synthetic and child.function == "[self]":
+                continue
+            own_time -= child.time
+            walk(child, path)
+        micros = int(round(own_time * 1_000_000))
+        if micros > 0:
+            lines.append(f"{';'.join(path)} {micros}")
+
+    if root_frame is not None:
+        walk(root_frame, [])
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class ProfilingService:
+    """Service for capturing and retrieving per-request profiles."""
+
+    @staticmethod
+    def should_profile(profile_token: Optional[str]) -> bool:
+        """
+        Decide whether the current request should be profiled.
+
+        Args:
+            profile_token: Value of the request's profiling header, if any
+
+        Returns:
+            True if the token is valid or the request was sampled
+        """
+        if profile_token and settings.admin_token:
+            if hmac.compare_digest(profile_token, settings.admin_token):
+                return True
+        # Sampled profiles are only retrievable through the admin endpoints,
+        # so don't capture them when those are disabled
+        if settings.profiling_sample_rate > 0 and settings.admin_token:
+            return random.random() < settings.profiling_sample_rate
+        return False
+
+    @staticmethod
+    async def profile(awaitable: Awaitable[Any], session_id: str) -> Tuple[Any, Optional[str]]:
+        """
+        Await a coroutine under the sampling profiler and store the artifact.
+
+        Args:
+            awaitable: Coroutine to profile (e.g. ChatService.process_message)
+            session_id: Session identifier, logged alongside the profile ID
+
+        Returns:
+            Tuple of (coroutine result, profile ID or None if saving failed)
+        """
+        profiler = Profiler(interval=settings.profiling_interval, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            result = await awaitable
+        finally:
+            session = profiler.stop()
+            duration = time.perf_counter() - started
+
+        profile_id = uuid.uuid4().hex
+        try:
+            # File writes and pruning would block the event loop
+            await asyncio.to_thread(
+                ProfilingService._save, profile_id, render_collapsed(session.root_frame())
+            )
+        except Exception as e:
+            # A failed capture must never fail the request itself
+            logger.warning("Failed to save profile %s: %s", profile_id, e)
+            return result, None
+
+        logger.info(
+            "Captured profile %s for session %s (%.1fms)",
+            profile_id, session_id, duration * 1000
+        )
+        return result, profile_id
+
+    @staticmethod
+    def list_profiles() -> List[dict]:
+        """
+        List stored profiles, newest first.
+
+        Returns:
+            List of dictionaries with profile_id, created_at and size_bytes
+        """
+        output_dir = Path(settings.profiling_output_dir)
+        if not output_dir.is_dir():
+            return []
+
+        profiles = []
+        for path in output_dir.glob(f"*{_ARTIFACT_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Pruned by a concurrent save since the glob
+                continue
+            profiles.append({
+                "profile_id": path.stem,
+                "created_at": stat.st_mtime,
+                "size_bytes": stat.st_size,
+            })
+        profiles.sort(key=lambda p: p["created_at"], reverse=True)
+        return profiles
+
+    @staticmethod
+    def get_profile(profile_id: str) -> Optional[str]:
+        """
+        Read a stored collapsed-stack profile.
+
+        Args:
+            profile_id: Profile identifier returned by `profile`
+
+        Returns:
+            Collapsed-stack text, or None if the ID is invalid or unknown
+        """
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = Path(settings.profiling_output_dir) / f"{profile_id}{_ARTIFACT_SUFFIX}"
+        if not path.is_file():
+            return None
+        return path.read_text()
+
+    @staticmethod
+    def _save(profile_id: str, content: str) -> None:
+        """Write an artifact and prune the oldest beyond the retention limit."""
+        output_dir = Path(settings.profiling_output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / f"{profile_id}{_ARTIFACT_SUFFIX}").write_text(content)
+
+        # Saves run in worker threads, so another save may prune concurrently
+        artifacts = []
+        for path in output_dir.glob(f"*{_ARTIFACT_SUFFIX}"):
+            try:
+                artifacts.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        artifacts.sort()
+        for _, stale in artifacts[:-settings.profiling_max_artifacts]:
+            stale.unlink(missing_ok=True)
@@ -28,8 +28,8 @@ class QuoteService:
             List of quote dictionaries with provider, premium, and coverage details
         """
         logger.info(
-            f"Get quotes: {vehicle_make} {vehicle_model} {vehicle_year}, "
-            f"coverage={coverage_type}"
+            "Get quotes: %s %s %s, coverage=%s",
+            vehicle_make, vehicle_model, vehicle_year, coverage_type
         )
         
         # Mock deterministic quotes
@@ -0,0 +1,280 @@
+"""Token-bucket rate limiting backed by Redis with an in-process fallback.
+
+Buckets live in Redis and are updated by a Lua script, so a limit holds across
+all uvicorn workers and a request is checked against every bucket it belongs to
+(session and client IP, each with its own policy) in one atomic round trip. When Redis is unreachable the
+limiter falls back to per-process buckets for a short back-off period rather
+than failing open or paying a connection timeout on every request.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import settings
+import itertools
+import math
+import time
+import logging
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket keys; ARGV[1]: cost, then rate (tokens/s) and burst (capacity)
+# for each key in order. Returns {allowed, remaining, retry_after, tightest}
+# where tightest is the 1-based index of the bucket with the fewest tokens left.
+# Floats are returned as strings because Redis truncates Lua numbers.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+
+local allowed = 1
+local retry_after = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        allowed = 0
+        retry_after = math.max(retry_after, (cost - tokens) / rate)
+    end
+end
+
+local remaining = nil
+local tightest = 1
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    local tokens = levels[i]
+    if allowed == 1 then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+    if remaining == nil or tokens < remaining then
+        remaining = tokens
+        tightest = i
+    end
+end
+
+return {allowed, tostring(remaining), tostring(retry_after), tightest}
+"""
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    """Refill rate and capacity of a class of buckets."""
+    name: str
+    rate: float
+    burst: float
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate-limit check."""
+    allowed: bool
+    limit: int
+    remaining: float
+    retry_after: float
+    reset_after: float
+
+
+class LocalTokenBucket:
+    """
+    In-process token buckets used when Redis is unavailable.
+
+    Buckets are kept in least-recently-used order. Once there are more than
+    `max_entries`, eviction runs at most every `evict_interval` seconds: it
+    first drops buckets that have refilled completely under their own policy
+    (dropping those changes nothing), then the least recently used ones.
+    """
+
+    def __init__(self, max_entries: int = 10000, evict_interval: float = 1.0):
+        # key -> (tokens, timestamp, time at which the bucket is full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self._last_evict = 0.0
+
+    def consume(self, buckets: Sequence[Tuple[str, BucketPolicy]], cost: float = 1.0) -> Tuple[bool, float, float, int]:
+        """
+        Atomically consume from all buckets, or from none if any is short.
+
+        Runs on the event loop thread only, so no locking is needed.
+
+        Args:
+            buckets: (key, policy) pairs the request is charged against
+            cost: Tokens the request consumes
+
+        Returns:
+            Tuple of (allowed, remaining tokens, seconds until retry, index of
+            the bucket with the fewest tokens left)
+        """
+        now = time.monotonic()
+        levels = []
+        allowed = True
+        retry_after = 0.0
+        for key, policy in buckets:
+            tokens, ts, _ = self._buckets.pop(key, (policy.burst, now, now))
+            tokens = min(policy.burst, tokens + max(0.0, now - ts) * policy.rate)
+            levels.append(tokens)
+            if tokens < cost:
+                allowed = False
+                retry_after = max(retry_after, (cost - tokens) / policy.rate)
+
+        remaining = None
+        tightest = 0
+        for index, ((key, policy), tokens) in enumerate(zip(buckets, levels)):
+            if allowed:
+                tokens -= cost
+            # Re-inserting moves the key to the most recently used end
+            self._buckets[key] = (tokens, now, now + (policy.burst - tokens) / policy.rate)
+            if remaining is None or tokens < remaining:
+                remaining = tokens
+                tightest = index
+
+        if len(self._buckets) > self.max_entries and now - self._last_evict >= self.evict_interval:
+            self._evict(now)
+        return allowed, remaining, retry_after, tightest
+
+    def _evict(self, now: float) -> None:
+        """Drop refilled buckets, then least recently used ones, down to capacity."""
+        self._last_evict = now
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+        excess = len(self._buckets) - self.max_entries
+        if excess > 0:
+            for key in list(itertools.islice(self._buckets, excess)):
+                del self._buckets[key]
+
+
+class RateLimitStats:
+    """Process-wide rate limiting counters."""
+
+    def __init__(self):
+        self.allowed: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+        self.redis_errors = 0
+        self.fallback_checks = 0
+
+    def record(self, route: str, allowed: bool) -> None:
+        counters = self.allowed if allowed else self.throttled
+        counters[route] = counters.get(route, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Return the current counters."""
+        return {
+            "allowed": dict(self.allowed),
+            "throttled": dict(self.throttled),
+            "redis_errors": self.redis_errors,
+            "fallback_checks": self.fallback_checks,
+        }
+
+
+class RateLimiter:
+    """Checks requests against Redis token buckets, falling back to local ones."""
+
+    def __init__(self, redis_url: str, key_prefix: str = "ratelimit", use_redis: bool = True):
+        """
+        Args:
+            redis_url: Redis connection URL
+            key_prefix: Prefix for bucket keys in Redis
+            use_redis: False to always use in-process buckets (single worker)
+        """
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.use_redis = use_redis
+        self.local = LocalTokenBucket()
+        self.stats = RateLimitStats()
+        self._redis: Optional[aioredis.Redis] = None
+        self._script = None
+        self._redis_down_until = 0.0
+
+    def _get_script(self):
+        if self._script is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                socket_timeout=settings.rate_limit_redis_timeout,
+                socket_connect_timeout=settings.rate_limit_redis_timeout,
+            )
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    async def check(self, route: str, buckets: Sequence[Tuple[str, BucketPolicy]], cost: float = 1.0) -> RateLimitResult:
+        """
+        Consume tokens for a request from every bucket it belongs to.
+
+        Args:
+            route: Route class the request is counted under (e.g. "llm")
+            buckets: (identity, policy) pairs such as ("sid:<id>", session policy)
+            cost: Tokens the request consumes
+
+        Returns:
+            RateLimitResult with the values for the rate limit headers, taken
+            from the bucket closest to throttling
+        """
+        keys = [(f"{self.key_prefix}:{policy.name}:{identity}", policy) for identity, policy in buckets]
+
+        allowed = None
+        if self.use_redis and time.monotonic() >= self._redis_down_until:
+            try:
+                args = [cost]
+                for _, policy in keys:
+                    args.extend((policy.rate, policy.burst))
+                raw_allowed, raw_remaining, raw_retry, raw_tightest = await self._get_script()(
+                    keys=[key for key, _ in keys], args=args
+                )
+                allowed = bool(int(raw_allowed))
+                remaining = float(raw_remaining)
+                retry_after = float(raw_retry)
+                tightest = int(raw_tightest) - 1
+            except Exception as e:
+                self.stats.redis_errors += 1
+                self._redis_down_until = time.monotonic() + settings.rate_limit_redis_backoff
+                logger.warning(
+                    "Rate limiter falling back to in-process buckets for %.0fs: %s",
+                    settings.rate_limit_redis_backoff, e
+                )
+
+        if allowed is None:
+            self.stats.fallback_checks += 1
+            allowed, remaining, retry_after, tightest = self.local.consume(keys, cost)
+
+        policy = keys[tightest][1]
+        self.stats.record(route, allowed)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=int(policy.burst),
+            remaining=max(0.0, remaining),
+            retry_after=retry_after,
+            reset_after=max(0.0, policy.burst - remaining) / policy.rate,
+        )
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        if self._redis is not None:
+            await self._redis.close()
+
+
+def rate_limit_headers(result: RateLimitResult) -> List[Tuple[bytes, bytes]]:
+    """
+    Build RateLimit-* (and Retry-After when throttled) response headers.
+
+    Args:
+        result: Outcome of a rate-limit check
+
+    Returns:
+        List of raw ASGI header pairs
+    """
+    headers = [
+        (b"ratelimit-limit", str(result.limit).encode()),
+        (b"ratelimit-remaining", str(int(result.remaining)).encode()),
+        (b"ratelimit-reset", str(math.ceil(result.reset_after)).encode()),
+    ]
+    if not result.allowed:
+        headers.append((b"retry-after", str(max(1, math.ceil(result.retry_after))).encode()))
+    return headers
@@ -0,0 +1,102 @@
+"""Runtime settings shared by all uvicorn workers through Redis.
+
+Settings changed at runtime (log level, agent-trace verbosity) are stored in a
+Redis hash. Each worker applies the stored values at startup and re-reads them
+every `runtime_settings_refresh_interval` seconds, so a change made through one
+worker reaches all of them and survives worker restarts.
+"""
+from typing import Dict, Optional
+from config import settings
+import asyncio
+import logging
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+LOGGING_SETTINGS_KEY = "settings:logging"
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def _get_redis() -> aioredis.Redis:
+    """Return the shared Redis client, creating it on first use."""
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=1.0,
+            socket_connect_timeout=1.0,
+        )
+    return _redis
+
+
+def parse_log_level(level: str) -> Optional[int]:
+    """Return the numeric logging level for a name, or None if unknown."""
+    value = logging.getLevelName(level.upper())
+    return value if isinstance(value, int) else None
+
+
+class RuntimeSettingsService:
+    """Service for runtime settings shared across workers."""
+
+    @staticmethod
+    def apply(values: Dict[str, str]) -> None:
+        """
+        Apply stored runtime settings to this worker.
+
+        Args:
+            values: Stored fields ("level", "agent_verbose") as strings
+        """
+        level = values.get("level")
+        if level and parse_log_level(level) is not None:
+            logging.getLogger().setLevel(parse_log_level(level))
+            settings.log_level = level.upper()
+        if "agent_verbose" in values:
+            settings.agent_verbose = values["agent_verbose"] == "1"
+
+    @staticmethod
+    async def update(level: Optional[str] = None, agent_verbose: Optional[bool] = None) -> None:
+        """
+        Store new runtime settings for all workers and apply them here.
+
+        Args:
+            level: Root log level name
+            agent_verbose: Whether agent executors print traces
+
+        Raises:
+            redis.RedisError: If the settings could not be stored
+        """
+        values = {}
+        if level is not None:
+            values["level"] = level.upper()
+        if agent_verbose is not None:
+            values["agent_verbose"] = "1" if agent_verbose else "0"
+        if not values:
+            return
+
+        await _get_redis().hset(LOGGING_SETTINGS_KEY, mapping=values)
+        RuntimeSettingsService.apply(values)
+
+    @staticmethod
+    async def refresh() -> None:
+        """Load the stored runtime settings and apply them to this worker."""
+        try:
+            values = await _get_redis().hgetall(LOGGING_SETTINGS_KEY)
+        except Exception as e:
+            logger.debug("Could not refresh runtime settings: %s", e)
+            return
+        RuntimeSettingsService.apply(values)
+
+    @staticmethod
+    async def refresh_forever() -> None:
+        """Periodically refresh runtime settings; run as a background task."""
+        while True:
+            await RuntimeSettingsService.refresh()
+            await asyncio.sleep(settings.runtime_settings_refresh_interval)
+
+    @staticmethod
+    async def close() -> None:
+        """Close the Redis connection pool."""
+        if _redis is not None:
+            await _redis.close()
@@ -27,7 +27,10 @@ class VehicleService:
         Returns:
             Dictionary with vehicle information
         """
-        logger.info(f"Vehicle lookup: vin={vin}, make={make}, model={model}, year={year}")
+        logger.info(
+            "Vehicle lookup: vin=%s, make=%s, model=%s, year=%s",
+            vin, make, model, year
+        )
         
         # Mock deterministic responses
         if vin:
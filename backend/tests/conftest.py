@@ -0,0 +1,5 @@
+"""Make backend modules importable as top-level packages, as under uvicorn."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+"""Tests for client IP resolution and rate-limit bucket selection."""
+import asyncio
+
+import pytest
+
+from api.middleware import RateLimitMiddleware, _client_ip
+from services.rate_limiter import RateLimiter
+
+TRUSTED = frozenset({"127.0.0.1", "10.0.0.2"})
+
+
+def make_scope(method="POST", path="/chat", client="203.0.113.7", forwarded_for=None, sid=None):
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    if sid is not None:
+        headers.append((b"cookie", f"theme=dark; sid={sid}".encode()))
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers,
+        "client": (client, 50000) if client else None,
+    }
+
+
+@pytest.fixture
+def middleware():
+    async def app(scope, receive, send):
+        pass
+
+    middleware = RateLimitMiddleware(app, RateLimiter("redis://unused", use_redis=False))
+    middleware.trusted_proxies = TRUSTED
+    return middleware
+
+
+def test_client_ip_untrusted_peer_ignores_forwarded_for():
+    scope = make_scope(client="203.0.113.7", forwarded_for="198.51.100.1")
+    assert _client_ip(scope, TRUSTED) == "203.0.113.7"
+
+
+def test_client_ip_trusted_peer_uses_rightmost_untrusted_entry():
+    scope = make_scope(client="127.0.0.1", forwarded_for="6.6.6.6, 198.51.100.1, 10.0.0.2")
+    assert _client_ip(scope, TRUSTED) == "198.51.100.1"
+
+
+def test_client_ip_trusted_peer_without_forwarded_for():
+    assert _client_ip(make_scope(client="127.0.0.1"), TRUSTED) is None
+
+
+def test_client_ip_trusted_peer_with_only_trusted_entries():
+    scope = make_scope(client="127.0.0.1", forwarded_for="10.0.0.2, 127.0.0.1")
+    assert _client_ip(scope, TRUSTED) is None
+
+
+def test_client_ip_without_peer():
+    assert _client_ip(make_scope(client=None), TRUSTED) is None
+
+
+def test_llm_buckets_charge_session_and_ip(middleware):
+    route, buckets = middleware._buckets(make_scope(sid="abc"))
+    assert route == "llm"
+    assert [(identity, policy.name) for identity, policy in buckets] == [
+        ("sid:abc", "llm"),
+        ("ip:203.0.113.7", "llm_ip"),
+    ]
+
+
+def test_llm_buckets_fail_closed_without_client_ip(middleware):
+    # A trusted proxy that did not resolve the client: the session alone is not enough
+    route, buckets = middleware._buckets(make_scope(client="127.0.0.1", sid="abc"))
+    assert route == "llm"
+    assert [(identity, policy.name) for identity, policy in buckets] == [
+        ("sid:abc", "llm"),
+        ("peer:127.0.0.1", "llm_unresolved"),
+    ]
+
+
+def test_llm_buckets_rotating_sessions_share_unresolved_bucket(middleware):
+    first = middleware._buckets(make_scope(client="127.0.0.1", sid="one"))[1][-1]
+    second = middleware._buckets(make_scope(client="127.0.0.1", sid="two"))[1][-1]
+    assert first == second
+
+
+def test_llm_buckets_spoofed_forwarded_for_from_untrusted_peer(middleware):
+    _, buckets = middleware._buckets(make_scope(forwarded_for="198.51.100.1"))
+    assert [identity for identity, _ in buckets] == ["ip:203.0.113.7"]
+
+
+def test_default_buckets_use_session_without_client_ip(middleware):
+    route, buckets = middleware._buckets(
+        make_scope(method="GET", path="/stats/prefetch", client="127.0.0.1", sid="abc")
+    )
+    assert route == "default"
+    assert [(identity, policy.name) for identity, policy in buckets] == [("sid:abc", "default")]
+
+
+def test_default_buckets_fall_back_to_peer(middleware):
+    _, buckets = middleware._buckets(make_scope(method="GET", path="/stats/prefetch", client="127.0.0.1"))
+    assert [(identity, policy.name) for identity, policy in buckets] == [("peer:127.0.0.1", "default")]
+
+
+def test_unresolved_bucket_throttles_across_sessions(middleware):
+    statuses = []
+
+    # Allowed requests reach the stub app, which sends nothing
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def run(requests):
+        for i in range(requests):
+            await middleware(make_scope(client="127.0.0.1", sid=f"rotating-{i}"), None, send)
+
+    asyncio.run(run(int(middleware.llm_unresolved_policy.burst) + 1))
+    assert statuses == [429]
@@ -2,6 +2,42 @@ import { NextRequest, NextResponse } from 'next/server'
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'
 
+// Rate limit headers from the backend that the browser should see
+const RATE_LIMIT_HEADERS = ['retry-after', 'ratelimit-limit', 'ratelimit-remaining', 'ratelimit-reset']
+
+// How the client address is found when this server sits behind a proxy.
+// Neither is trusted by default: a client can send any header it likes.
+// CLIENT_IP_HEADER: header a trusted edge overwrites with the client address (e.g. x-real-ip)
+// TRUSTED_PROXY_HOPS: number of trusted proxies in front of this server that append to X-Forwarded-For
+const CLIENT_IP_HEADER = process.env.CLIENT_IP_HEADER?.toLowerCase()
+const TRUSTED_PROXY_HOPS = Number(process.env.TRUSTED_PROXY_HOPS || 0)
+
+// Find the end user's address so the backend rate-limits per client instead
+// of treating this server as the client. Returns undefined when it cannot be
+// established; the backend then applies its strict shared bucket.
+function clientAddress(request: NextRequest): string | undefined {
+  // Set by the hosting platform from the connection, not from client headers
+  if (request.ip) {
+    return request.ip
+  }
+  if (CLIENT_IP_HEADER) {
+    const address = request.headers.get(CLIENT_IP_HEADER)?.trim()
+    if (address) {
+      return address
+    }
+  }
+  if (TRUSTED_PROXY_HOPS > 0) {
+    // Each trusted proxy appends its peer, so the client is N entries from the end;
+    // anything before that was written by the client
+    const chain = (request.headers.get('x-forwarded-for') || '')
+      .split(',')
+      .map((address) => address.trim())
+      .filter(Boolean)
+    return chain[chain.length - TRUSTED_PROXY_HOPS]
+  }
+  return undefined
+}
+
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
@@ -16,6 +52,7 @@ export async function POST(request: NextRequest) {
 
     // Get session ID from cookie if present
     const sid = request.cookies.get('sid')?.value
+    const clientIp = clientAddress(request)
 
     // Forward request to backend
     const response = await fetch(`${BACKEND_URL}/chat`, {
@@ -23,11 +60,28 @@ export async function POST(request: NextRequest) {
       headers: {
         'Content-Type': 'application/json',
         ...(sid && { Cookie: `sid=${sid}` }),
+        // Only the resolved address is sent; a client-supplied chain is never passed on
+        ...(clientIp && { 'X-Forwarded-For': clientIp }),
       },
       credentials: 'include', // Include cookies in request
       body: JSON.stringify({ message, sid }),
     })
 
+    // Pass throttling through unchanged so the client can back off
+    if (response.status === 429) {
+      const throttled = NextResponse.json(
+        { error: 'Too many requests', message: 'Too many requests. Please wait a moment and try again.' },
+        { status: 429 }
+      )
+      for (const name of RATE_LIMIT_HEADERS) {
+        const value = response.headers.get(name)
+        if (value) {
+          throttled.headers.set(name, value)
+        }
+      }
+      return throttled
+    }
+
     if (!response.ok) {
       const errorText = await response.text()
       throw new Error(`Backend error: ${response.status} - ${errorText}`)
@@ -47,6 +47,20 @@ export default function ChatWindow() {
         credentials: 'include', // Include cookies for session
       })
 
+      if (response.status === 429) {
+        const retryAfter = response.headers.get('retry-after')
+        const throttledMessage: Message = {
+          id: (Date.now() + 1).toString(),
+          role: 'assistant',
+          content: retryAfter
+            ? `You're sending messages too quickly. Please try again in ${retryAfter} seconds.`
+            : "You're sending messages too quickly. Please try again shortly.",
+          timestamp: new Date(),
+        }
+        setMessages((prev) => [...prev, throttledMessage])
+        return
+      }
+
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`)
       }